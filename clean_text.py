@@ -5,15 +5,33 @@ Ce module permet de corriger et reformuler du texte extrait par OCR
 en utilisant un modèle de langage local (LM Studio).
 """
 
+import asyncio
+import codecs
+import collections
+import hashlib
+import io
+import json
 import logging
+import math
+import mmap
 import os
 import re
+import statistics
 import sys
+import time
+import unicodedata
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
 
+import httpx
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
 from requests.exceptions import RequestException, Timeout
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
 
 # Configuration du logging
 logging.basicConfig(
@@ -22,6 +40,185 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Séparateur de paragraphes et ponctuation de fin de phrase
+_PARAGRAPH_SEP = "\n\n"
+_PARAGRAPH_SEP_BYTES = b"\n\n"
+_SENTENCE_END_TABLE = str.maketrans("!?", "..")
+
+# Estimation prudente du nombre de caractères par token, en l'absence de tokenizer
+_CHARS_PER_TOKEN = 3
+
+# Indices d'erreurs OCR : caractères parasites et chiffres au milieu d'un mot
+_OCR_ARTIFACT_CHARS = frozenset("|~^`")
+_DIGIT_IN_WORD = re.compile(r"[^\W\d_]\d+[^\W\d_]")
+_ARTIFACT_RATIO_THRESHOLD = 0.002
+
+
+def _hash_text(text: str) -> str:
+    """Empreinte SHA-256 d'un texte."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _split_sentences(paragraph: str) -> List[str]:
+    """
+    Découpe un paragraphe en phrases.
+
+    Coupe après chaque '.', '!' ou '?' suivi d'espaces, en supprimant ces
+    espaces : même résultat que `re.split(r'(?<=[.!?])\\s+', paragraph)`,
+    mais par simple balayage avec `str.find`, sans moteur d'expressions
+    régulières.
+
+    Args:
+        paragraph: Paragraphe à découper
+
+    Returns:
+        Liste des phrases
+    """
+    sentences = []
+    start = 0
+    length = len(paragraph)
+    
+    # '!' et '?' sont ramenés à '.' pour n'avoir qu'un caractère à chercher
+    marks = paragraph.translate(_SENTENCE_END_TABLE)
+    end = marks.find(".") + 1
+    
+    while end:
+        resume = end
+        while resume < length and paragraph[resume].isspace():
+            resume += 1
+        
+        if resume > end:
+            sentences.append(paragraph[start:end])
+            start = resume
+        
+        end = marks.find(".", resume) + 1
+    
+    sentences.append(paragraph[start:])
+    return sentences
+
+
+def _iter_byte_paragraphs(buffer: Union[bytes, mmap.mmap]) -> Iterator[str]:
+    """
+    Découpe un tampon UTF-8 en paragraphes, décodés un par un.
+
+    La recherche des séparateurs se fait sur les octets : un octet 0x0A ne
+    pouvant pas apparaître dans un caractère UTF-8 multi-octets, le résultat
+    est identique à `buffer.decode("utf-8").split("\\n\\n")`, sans
+    décoder le tampon entier.
+
+    Args:
+        buffer: Octets UTF-8 (bytes ou mmap)
+
+    Yields:
+        Paragraphes décodés, dans l'ordre
+    """
+    start = 0
+    while True:
+        end = buffer.find(_PARAGRAPH_SEP_BYTES, start)
+        if end == -1:
+            yield buffer[start:].decode("utf-8")
+            return
+        yield buffer[start:end].decode("utf-8")
+        start = end + len(_PARAGRAPH_SEP_BYTES)
+
+
+def iter_paragraphs(path: Path, block_size: int = 1 << 20) -> Iterator[str]:
+    """
+    Lit un fichier texte UTF-8 paragraphe par paragraphe.
+
+    Le fichier est projeté en mémoire (mmap) et seul le paragraphe en cours
+    est décodé. Le résultat est identique à
+    `path.read_text(encoding="utf-8").split("\\n\\n")` : si le fichier
+    contient des fins de ligne Windows ou Mac ('\\r'), il est décodé par
+    blocs avec la même normalisation que `Path.read_text`.
+
+    Args:
+        path: Chemin du fichier texte
+        block_size: Taille des blocs décodés quand les fins de ligne doivent
+            être normalisées, en octets
+
+    Yields:
+        Paragraphes du fichier, dans l'ordre
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap refuse les fichiers vides
+            yield ""
+            return
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Sans '\r', aucune normalisation : découpage direct sur les octets
+            if mm.find(b"\r") == -1:
+                yield from _iter_byte_paragraphs(mm)
+                return
+            
+            decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder("utf-8")(), translate=True
+            )
+            pending = ""
+            
+            for offset in range(0, len(mm), block_size):
+                block = decoder.decode(mm[offset:offset + block_size])
+                paragraphs = (pending + block).split(_PARAGRAPH_SEP)
+                pending = paragraphs.pop()
+                yield from paragraphs
+            
+            paragraphs = (pending + decoder.decode(b"", final=True)).split(_PARAGRAPH_SEP)
+            yield from paragraphs
+
+
+@dataclass
+class Endpoint:
+    """Serveur LM Studio utilisé pour la correction asynchrone."""
+
+    url: str
+    limit: int
+    inflight: int = 0
+    unhealthy_until: float = 0.0
+    semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def load(self) -> float:
+        """Charge relative du serveur (requêtes en cours / limite)."""
+        return self.inflight / self.limit
+
+
+class _OrderedChunkWriter:
+    """Écrit les segments corrigés dans leur ordre d'origine, dès qu'ils sont prêts."""
+
+    def __init__(self, out_fp: TextIO):
+        """
+        Initialise l'écrivain.
+
+        Args:
+            out_fp: Fichier de sortie ouvert en écriture
+        """
+        self.out_fp = out_fp
+        self.next_index = 1
+        self.chars_written = 0
+        self._ready: Dict[int, str] = {}
+
+    def add(self, index: int, corrected: str) -> None:
+        """
+        Enregistre un segment corrigé et écrit tous ceux qui peuvent l'être.
+
+        Args:
+            index: Numéro du segment (à partir de 1)
+            corrected: Texte corrigé du segment
+        """
+        self._ready[index] = corrected
+        
+        while self.next_index in self._ready:
+            corrected = self._ready.pop(self.next_index)
+            if self.next_index > 1:
+                self.out_fp.write(_PARAGRAPH_SEP)
+                self.chars_written += len(_PARAGRAPH_SEP)
+            self.out_fp.write(corrected)
+            self.chars_written += len(corrected)
+            self.next_index += 1
+        
+        self.out_fp.flush()
+
 
 class TextCorrector:
     """Correcteur de texte OCR utilisant un LLM local."""
@@ -32,7 +229,14 @@ class TextCorrector:
         model: str = "openai/gpt-oss-20b",
         temperature: float = 0.2,
         max_tokens: int = 2048,
-        timeout: int = 60
+        timeout: int = 60,
+        timeout_floor: float = 10.0,
+        max_concurrency: int = 8,
+        cache_dir: Optional[Path] = None,
+        cache_nondeterministic: bool = False,
+        tokenizer: Optional[str] = None,
+        cool_down_s: float = 30.0,
+        api_urls: Optional[List[Union[str, Dict[str, Any]]]] = None
     ):
         """
         Initialise le correcteur de texte.
@@ -42,31 +246,216 @@ class TextCorrector:
             model: Nom du modèle à utiliser
             temperature: Température de génération (0.0-1.0)
             max_tokens: Nombre maximum de tokens à générer
-            timeout: Timeout des requêtes en secondes
+            timeout: Timeout initial des requêtes en secondes
+            timeout_floor: Timeout minimal une fois le timeout adapté aux
+                latences observées
+            max_concurrency: Nombre maximum de requêtes simultanées par serveur
+            cache_dir: Dossier du cache disque des réponses (None pour désactiver)
+            cache_nondeterministic: Utiliser le cache même si temperature > 0
+            tokenizer: Encodage tiktoken ou modèle Hugging Face servant à
+                mesurer les segments en tokens plutôt qu'en caractères
+            cool_down_s: Durée d'exclusion d'un serveur après une erreur
+            api_urls: URLs de plusieurs serveurs LM Studio entre lesquels
+                répartir les requêtes asynchrones ; chaque entrée est une URL
+                ou un dictionnaire {"url": ..., "concurrency_limit": ...}.
+                Remplace `api_url` si fourni ; une URL seule est acceptée.
+
+        Raises:
+            ValueError: Si une limite de requêtes simultanées est inférieure à 1
         """
-        self.api_url = api_url
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.timeout = timeout
+        self.timeout_floor = timeout_floor
+        self.max_concurrency = max_concurrency
+        self.tokenizer = tokenizer
+        self.cool_down_s = cool_down_s
+        
+        # Serveurs disponibles ; le chemin synchrone utilise le premier.
+        # Une URL seule serait sinon parcourue caractère par caractère
+        if isinstance(api_urls, str):
+            api_urls = [api_urls]
+        self._endpoints = [
+            Endpoint(url=spec, limit=max_concurrency) if isinstance(spec, str)
+            else Endpoint(url=spec["url"], limit=spec.get("concurrency_limit", max_concurrency))
+            for spec in (api_urls or [api_url])
+        ]
+        self.api_url = self._endpoints[0].url
+        
+        # Une limite nulle bloquerait toutes les requêtes (Semaphore(0))
+        for endpoint in self._endpoints:
+            if endpoint.limit < 1:
+                raise ValueError(
+                    f"Limite de requêtes simultanées invalide pour {endpoint.url}: {endpoint.limit} (minimum 1)"
+                )
+        
+        # Fonctions d'encodage/décodage du tokenizer, chargées à la demande
+        self._encode: Optional[Callable[[str], List[int]]] = None
+        self._decode: Optional[Callable[[List[int]], str]] = None
+        
+        # Latences par caractère des dernières requêtes réussies, pour
+        # adapter le timeout à la longueur de chaque requête
+        self._latencies: collections.deque = collections.deque(maxlen=64)
+        
+        # Session HTTP persistante : réutilise les connexions keep-alive
+        # au lieu d'ouvrir une nouvelle connexion TCP par segment
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+            read=False  # les timeouts de lecture sont gérés par _post_completion
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=256, max_retries=retries)
+        self._session = requests.Session()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
+        # Cache disque des réponses, indexé par (modèle, paramètres, texte).
+        # Une réponse n'est réutilisable que si la génération est déterministe.
+        self._cache = None
+        if cache_dir is not None:
+            if temperature == 0 or cache_nondeterministic:
+                import diskcache
+                self._cache = diskcache.Cache(str(cache_dir))
+                logger.debug(f"Cache des réponses: {cache_dir}")
+            else:
+                logger.debug("Cache désactivé (temperature > 0)")
         
         # Vérifier la connexion à l'API
         self._check_api_connection()
 
+    def close(self) -> None:
+        """Ferme la session HTTP et le cache disque."""
+        self._session.close()
+        if self._cache is not None:
+            self._cache.close()
+
+    def __enter__(self) -> "TextCorrector":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def _check_api_connection(self) -> None:
-        """Vérifie que l'API LM Studio est accessible."""
+        """
+        Vérifie que chaque serveur LM Studio est accessible.
+
+        La vérification n'utilise pas la session, dont les nouvelles
+        tentatives retarderaient l'avertissement pour un serveur injoignable.
+        """
+        for endpoint in self._endpoints:
+            try:
+                response = requests.get(
+                    endpoint.url.replace("/v1/chat/completions", "/v1/models"),
+                    timeout=5
+                )
+                if response.ok:
+                    logger.info(f"✓ Connexion à l'API LM Studio établie ({endpoint.url})")
+                else:
+                    logger.warning(f"API accessible mais retourne le code {response.status_code}")
+            except RequestException:
+                logger.warning("⚠ Impossible de se connecter à l'API LM Studio")
+                logger.warning(f"   Vérifiez que LM Studio est lancé sur {endpoint.url}")
+
+    @property
+    def _total_concurrency(self) -> int:
+        """Nombre total de requêtes simultanées, tous serveurs confondus."""
+        return sum(endpoint.limit for endpoint in self._endpoints)
+
+    def _reset_endpoints(self) -> None:
+        """Réinitialise l'état des serveurs pour une nouvelle boucle asyncio."""
+        for endpoint in self._endpoints:
+            endpoint.inflight = 0
+            endpoint.semaphore = asyncio.Semaphore(endpoint.limit)
+
+    def _pick_endpoint(self) -> Endpoint:
+        """
+        Choisit le serveur le moins chargé parmi ceux en bon état.
+
+        Returns:
+            Serveur sélectionné (le moins chargé de tous si aucun n'est
+            disponible)
+        """
+        now = time.monotonic()
+        healthy = [e for e in self._endpoints if e.unhealthy_until <= now]
+        return min(healthy or self._endpoints, key=lambda e: e.load)
+
+    def _load_tokenizer(self) -> None:
+        """Charge le tokenizer configuré (tiktoken, sinon transformers)."""
+        if self._encode is not None:
+            return
+        
         try:
-            response = requests.get(
-                self.api_url.replace("/v1/chat/completions", "/v1/models"),
-                timeout=5
-            )
-            if response.ok:
-                logger.info("✓ Connexion à l'API LM Studio établie")
+            import tiktoken
+            try:
+                encoding = tiktoken.get_encoding(self.tokenizer)
+            except ValueError:
+                encoding = tiktoken.encoding_for_model(self.tokenizer)
+            self._encode = encoding.encode
+            self._decode = encoding.decode
+        except (ImportError, KeyError):
+            from transformers import AutoTokenizer
+            hf_tokenizer = AutoTokenizer.from_pretrained(self.tokenizer)
+            self._encode = lambda s: hf_tokenizer.encode(s, add_special_tokens=False)
+            self._decode = hf_tokenizer.decode
+        
+        logger.debug(f"Tokenizer chargé: {self.tokenizer}")
+
+    def _measure(self) -> Callable[[str], int]:
+        """
+        Retourne la fonction de mesure de la taille d'un texte.
+
+        Returns:
+            `len` sans tokenizer, sinon le nombre de tokens du texte
+        """
+        if self.tokenizer is None:
+            return len
+        
+        self._load_tokenizer()
+        encode = self._encode
+        return lambda s: len(encode(s))
+
+    def _split_oversized(self, text: str, max_size: int) -> Iterator[Tuple[str, int]]:
+        """
+        Découpe un texte trop long en morceaux d'au plus `max_size` unités.
+
+        Args:
+            text: Texte à découper
+            max_size: Taille maximale d'un morceau (caractères ou tokens)
+
+        Yields:
+            Couples (morceau, taille du morceau)
+        """
+        if self.tokenizer is None:
+            for i in range(0, len(text), max_size):
+                part = text[i:i + max_size]
+                yield part, len(part)
+            return
+        
+        tokens = self._encode(text)
+        # Position du morceau suivant dans le texte
+        pos = 0
+        start = 0
+        while start < len(tokens):
+            end = min(start + max_size, len(tokens))
+            # Une fenêtre qui s'arrête au milieu d'un caractère multi-octets
+            # le décoderait en U+FFFD : la fin est déplacée (d'au plus trois
+            # tokens) jusqu'à une frontière de caractère
+            candidates = list(range(end, max(start, end - 4), -1))
+            candidates += range(end + 1, min(len(tokens), end + 3) + 1)
+            for stop in candidates:
+                part = self._decode(tokens[start:stop])
+                if text.startswith(part, pos):
+                    end = stop
+                    break
             else:
-                logger.warning(f"API accessible mais retourne le code {response.status_code}")
-        except RequestException:
-            logger.warning("⚠ Impossible de se connecter à l'API LM Studio")
-            logger.warning(f"   Vérifiez que LM Studio est lancé sur {self.api_url}")
+                part = self._decode(tokens[start:end])
+            
+            pos += len(part)
+            yield part, end - start
+            start = end
 
     def split_text_into_chunks(self, text: str, max_chars: int = 2000) -> List[str]:
         """
@@ -74,99 +463,521 @@ class TextCorrector:
 
         Args:
             text: Texte à diviser
-            max_chars: Taille maximale de chaque segment
+            max_chars: Taille maximale de chaque segment (en caractères, ou en
+                tokens si un tokenizer est configuré)
+
+        Returns:
+            Liste des segments de texte
+        """
+        return self.split_paragraphs_into_chunks(text.split(_PARAGRAPH_SEP), max_chars=max_chars)
+
+    def split_text_into_chunks_bytes(self, raw_bytes: bytes, max_chars: int = 2000) -> List[str]:
+        """
+        Divise un texte UTF-8 brut en segments, sans le décoder en entier.
+
+        Les paragraphes sont repérés sur les octets et décodés un par un.
+        Les fins de ligne ne sont pas normalisées.
+
+        Args:
+            raw_bytes: Texte encodé en UTF-8
+            max_chars: Taille maximale de chaque segment (en caractères, ou en
+                tokens si un tokenizer est configuré)
+
+        Returns:
+            Liste des segments de texte
+        """
+        return self.split_paragraphs_into_chunks(
+            _iter_byte_paragraphs(raw_bytes), max_chars=max_chars
+        )
+
+    def split_paragraphs_into_chunks(
+        self,
+        paragraphs: Iterable[str],
+        max_chars: int = 2000
+    ) -> List[str]:
+        """
+        Regroupe une suite de paragraphes en segments pour éviter les erreurs d'API.
+
+        Les paragraphes peuvent être fournis par un générateur (voir
+        `iter_paragraphs`), sans charger tout le texte en mémoire.
+
+        Si un tokenizer est configuré, la taille des segments est mesurée
+        en tokens, ce qui permet de remplir au mieux le contexte du modèle.
+
+        Args:
+            paragraphs: Paragraphes du texte, dans l'ordre
+            max_chars: Taille maximale de chaque segment (en caractères, ou en
+                tokens si un tokenizer est configuré)
 
         Returns:
             Liste des segments de texte
         """
-        # Diviser par paragraphes
-        paragraphs = text.split('\n\n')
+        measure = self._measure()
+        space_len = measure(" ")
+        paragraph_sep_len = measure(_PARAGRAPH_SEP)
+        
         chunks = []
-        current_chunk = ""
+        
+        # Le segment courant est accumulé par morceaux et n'est assemblé
+        # qu'une fois complet, pour éviter les concaténations répétées
+        current_parts: List[str] = []
+        current_len = 0
+        
+        def append(piece: str, piece_len: int, sep: str, sep_len: int) -> None:
+            """Ajoute un morceau au segment courant, ou ouvre un nouveau segment."""
+            nonlocal current_len
+            if not current_len:
+                current_parts.clear()
+            elif current_len + piece_len > max_chars:
+                chunks.append("".join(current_parts).strip())
+                current_parts.clear()
+            else:
+                current_parts.append(sep)
+                current_parts.append(piece)
+                current_len += sep_len + piece_len
+                return
+            current_parts.append(piece)
+            current_len = piece_len
         
         for paragraph in paragraphs:
-            # Si le paragraphe est trop long, le diviser par phrases
-            if len(paragraph) > max_chars:
-                sentences = re.split(r'(?<=[.!?])\s+', paragraph)
+            paragraph_len = measure(paragraph)
+            
+            # Paragraphe assez court : ajouté tel quel
+            if paragraph_len <= max_chars:
+                append(paragraph, paragraph_len, _PARAGRAPH_SEP, paragraph_sep_len)
+                continue
+            
+            # Sinon, le diviser par phrases
+            for sentence in _split_sentences(paragraph):
+                if not sentence.strip():
+                    continue
                 
-                for sentence in sentences:
-                    if not sentence.strip():
-                        continue
-                        
-                    # Si une phrase est trop longue, la découper
-                    if len(sentence) > max_chars:
-                        for i in range(0, len(sentence), max_chars):
-                            chunk_part = sentence[i:i + max_chars]
-                            if current_chunk and len(current_chunk + chunk_part) > max_chars:
-                                chunks.append(current_chunk.strip())
-                                current_chunk = chunk_part
-                            else:
-                                current_chunk += " " + chunk_part if current_chunk else chunk_part
-                    else:
-                        if current_chunk and len(current_chunk + sentence) > max_chars:
-                            chunks.append(current_chunk.strip())
-                            current_chunk = sentence
-                        else:
-                            current_chunk += " " + sentence if current_chunk else sentence
-            else:
-                if current_chunk and len(current_chunk + paragraph) > max_chars:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = paragraph
+                sentence_len = measure(sentence)
+                
+                # Si une phrase est trop longue, la découper
+                if sentence_len > max_chars:
+                    for chunk_part, part_len in self._split_oversized(sentence, max_chars):
+                        append(chunk_part, part_len, " ", space_len)
                 else:
-                    current_chunk += "\n\n" + paragraph if current_chunk else paragraph
+                    append(sentence, sentence_len, " ", space_len)
         
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        last_chunk = "".join(current_parts).strip()
+        if last_chunk:
+            chunks.append(last_chunk)
         
         return chunks
 
-    def correct_text(self, text: str) -> str:
+    def _build_payload(self, text: str, strict: bool = False) -> dict:
         """
-        Corrige un segment de texte via l'API LLM.
+        Construit le corps de la requête de correction pour un segment.
+
+        La réponse est contrainte par un schéma JSON `{"corrected": "..."}`,
+        ce qui évite de récupérer un préambule du modèle avec le texte.
 
         Args:
             text: Texte à corriger
+            strict: Insister sur le format JSON (nouvel essai après une
+                réponse invalide)
 
         Returns:
-            Texte corrigé (ou texte original en cas d'erreur)
+            Corps JSON de la requête chat/completions
         """
+        instruction = 'Réponds uniquement en JSON : {"corrected": "texte corrigé"}.'
+        if strict:
+            instruction += "\nTa réponse doit être un objet JSON valide, sans aucun texte avant ou après."
+        
         prompt = f"""Corrige et reformule légèrement ce texte OCR pour qu'il soit lisible, 
 sans fautes et sans caractères étranges, mais en gardant le sens original.
 Ne change pas la structure ni le contenu, corrige uniquement les erreurs OCR.
+{instruction}
 
 {text}
 """
+        payload = self._chat_payload(prompt)
+        payload["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "ocr_fix",
+                "schema": {
+                    "type": "object",
+                    "properties": {"corrected": {"type": "string"}},
+                    "required": ["corrected"]
+                }
+            }
+        }
+        return payload
+
+    @staticmethod
+    def _parse_response(content: str) -> str:
+        """
+        Extrait le texte corrigé de la réponse JSON d'un segment.
+
+        Args:
+            content: Contenu généré par le modèle
+
+        Returns:
+            Texte corrigé
 
+        Raises:
+            ValueError: Si la réponse n'est pas un JSON conforme
+        """
         try:
-            response = requests.post(
-                self.api_url,
-                headers={"Content-Type": "application/json"},
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens
-                },
-                timeout=self.timeout
-            )
+            corrected = orjson.loads(content)["corrected"]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"champ 'corrected' absent: {e}") from e
+        
+        if not isinstance(corrected, str):
+            raise ValueError("le champ 'corrected' n'est pas une chaîne")
+        return corrected.strip()
+
+    def _build_batch_payload(self, texts: List[str]) -> dict:
+        """
+        Construit le corps d'une requête corrigeant plusieurs segments à la fois.
+
+        Les segments sont numérotés dans un seul message et le modèle doit
+        répondre par un objet JSON contenant la liste des corrections.
+
+        Args:
+            texts: Segments à corriger
+
+        Returns:
+            Corps JSON de la requête chat/completions
+        """
+        count = len(texts)
+        segments = "\n".join(f"<<<{k}>>>\n{text}" for k, text in enumerate(texts, 1))
+        prompt = f"""Corrige et reformule légèrement ces {count} segments de texte OCR pour qu'ils soient lisibles,
+sans fautes et sans caractères étranges, mais en gardant le sens original.
+Ne change pas la structure ni le contenu, corrige uniquement les erreurs OCR.
+Réponds uniquement en JSON : {{"n": {count}, "items": ["segment 1 corrigé", ...]}}, dans l'ordre des segments.
+
+Segments :
+{segments}
+"""
+        payload = self._chat_payload(prompt)
+        payload["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "ocr_batch",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "n": {"type": "integer"},
+                        "items": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["n", "items"]
+                }
+            }
+        }
+        return payload
+
+    def _chat_payload(self, prompt: str) -> dict:
+        """Corps commun des requêtes chat/completions pour un prompt donné."""
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens
+        }
+
+    @staticmethod
+    def _parse_batch_response(content: str, count: int) -> List[str]:
+        """
+        Extrait les segments corrigés de la réponse JSON d'une requête groupée.
+
+        Args:
+            content: Contenu généré par le modèle
+            count: Nombre de segments attendus
+
+        Returns:
+            Segments corrigés, dans l'ordre de la requête
+
+        Raises:
+            ValueError: Si la réponse n'est pas un JSON conforme
+        """
+        try:
+            items = orjson.loads(content)["items"]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"champ 'items' absent: {e}") from e
+        
+        if (not isinstance(items, list) or len(items) != count
+                or not all(isinstance(item, str) for item in items)):
+            raise ValueError(f"{count} segments attendus dans la réponse")
+        
+        return [item.strip() for item in items]
+
+    def _cache_key(self, text: str) -> str:
+        """Calcule la clé de cache d'un segment pour la configuration courante."""
+        return _hash_text(f"{self.model}|{self.temperature}|{self.max_tokens}|{text}")
+
+    def _cache_get(self, text: str) -> Optional[str]:
+        """Retourne la correction en cache pour ce segment, si elle existe."""
+        if self._cache is None:
+            return None
+        return self._cache.get(self._cache_key(text))
+
+    def _cache_set(self, text: str, corrected: str) -> None:
+        """Enregistre la correction d'un segment dans le cache."""
+        if self._cache is not None:
+            self._cache.set(self._cache_key(text), corrected)
+
+    def _current_timeout(self, size: int) -> float:
+        """
+        Calcule le timeout de la prochaine requête.
+
+        Une fois assez de latences observées, le timeout vaut 1,5 fois le
+        95e centile des latences par caractère des requêtes réussies
+        récentes, multiplié par la longueur du texte envoyé (au moins
+        `timeout_floor`) : un segment long n'hérite pas du timeout appris
+        sur des segments courts.
+
+        Args:
+            size: Longueur du texte à corriger, en caractères
+
+        Returns:
+            Timeout en secondes
+        """
+        if len(self._latencies) < 8:
+            return self.timeout
+        p95 = statistics.quantiles(self._latencies, n=20)[-1]
+        return max(self.timeout_floor, 1.5 * p95 * max(size, 1))
+
+    @staticmethod
+    def _parse_sse_line(line: Union[bytes, str]) -> Optional[str]:
+        """
+        Extrait le fragment de texte d'une ligne du flux SSE de l'API.
+
+        Args:
+            line: Ligne du flux (octets ou texte), sans le saut de ligne final
+
+        Returns:
+            Fragment de contenu (éventuellement vide), ou None en fin de flux
+
+        Raises:
+            KeyError: Si l'événement ne contient pas de champ "choices"
+        """
+        prefix, done = (b"data:", b"[DONE]") if isinstance(line, bytes) else ("data:", "[DONE]")
+        if not line.startswith(prefix):
+            return ""
+        
+        payload = line[len(prefix):].strip()
+        if payload == done:
+            return None
+        
+        choices = orjson.loads(payload)["choices"]
+        if not choices:
+            return ""
+        return choices[0].get("delta", {}).get("content") or ""
+
+    def _post_completion(self, payload: dict, size: int) -> str:
+        """
+        Envoie une requête en streaming, avec un nouvel essai à timeout doublé.
+
+        Les fragments de la réponse sont concaténés au fil de leur arrivée.
+        Le timeout porte sur la durée totale de la réponse, comme dans
+        `_apost_completion`, et pas seulement sur l'attente entre deux
+        fragments.
+
+        Args:
+            payload: Corps JSON de la requête
+            size: Longueur du texte à corriger, en caractères (voir
+                `_current_timeout`)
+
+        Returns:
+            Contenu complet généré par le modèle
+
+        Raises:
+            Timeout: Si le second essai expire également
+            RequestException: En cas d'erreur de connexion ou HTTP
+        """
+        body = orjson.dumps({**payload, "stream": True})
+        timeout = self._current_timeout(size)
+        
+        for attempt in range(2):
+            start = time.perf_counter()
+            deadline = start + timeout
+            try:
+                with self._session.post(
+                    self.api_url,
+                    headers={"Content-Type": "application/json"},
+                    data=body,
+                    timeout=timeout,
+                    stream=True
+                ) as response:
+                    response.raise_for_status()
+                    
+                    parts = []
+                    for line in response.iter_lines():
+                        fragment = self._parse_sse_line(line)
+                        if fragment is None:
+                            break
+                        parts.append(fragment)
+                        if time.perf_counter() > deadline:
+                            raise Timeout(f"Réponse incomplète après {timeout:.0f}s")
+            except (Timeout, RequestsConnectionError) as e:
+                # Un délai de lecture dépassé pendant le flux est signalé
+                # par requests comme une erreur de connexion
+                read_timeout = isinstance(e, Timeout) or (e.args and isinstance(e.args[0], ReadTimeoutError))
+                if not read_timeout:
+                    raise
+                if attempt:
+                    if isinstance(e, Timeout):
+                        raise
+                    raise Timeout(str(e.args[0])) from e
+                logger.warning(f"Timeout après {timeout:.0f}s, nouvel essai avec {2 * timeout:.0f}s")
+                timeout *= 2
+                continue
             
+            self._latencies.append((time.perf_counter() - start) / max(size, 1))
+            return "".join(parts)
+
+    @staticmethod
+    def _http2_available() -> bool:
+        """Indique si le paquet `h2`, requis par httpx pour HTTP/2, est installé."""
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.debug("Paquet 'h2' absent, HTTP/1.1 uniquement (pip install 'httpx[http2]')")
+            return False
+        return True
+
+    @staticmethod
+    async def _astream_completion(client: httpx.AsyncClient, url: str, body: bytes) -> List[str]:
+        """
+        Envoie une requête en streaming et lit le flux SSE jusqu'au bout.
+
+        Args:
+            client: Client httpx partagé
+            url: Adresse du serveur
+            body: Corps JSON déjà sérialisé
+
+        Returns:
+            Fragments de contenu, dans l'ordre
+
+        Raises:
+            httpx.HTTPStatusError: Si le serveur renvoie une erreur HTTP
+            httpx.TransportError: En cas d'erreur de connexion
+        """
+        parts = []
+        async with client.stream(
+            "POST",
+            url,
+            headers={"Content-Type": "application/json"},
+            content=body
+        ) as response:
             response.raise_for_status()
-            data = response.json()
             
-            # Validation de la structure de réponse
-            if "choices" not in data or not data["choices"]:
-                logger.error(f"Structure de réponse invalide: {data}")
+            async for line in response.aiter_lines():
+                fragment = TextCorrector._parse_sse_line(line)
+                if fragment is None:
+                    break
+                parts.append(fragment)
+        
+        return parts
+
+    async def _apost_completion(self, client: httpx.AsyncClient, payload: dict, size: int) -> str:
+        """
+        Version asynchrone de `_post_completion`, répartie entre les serveurs.
+
+        Chaque requête part vers le serveur le moins chargé. Un serveur qui
+        renvoie une erreur 5xx ou refuse la connexion est écarté pendant
+        `cool_down_s` secondes et la requête est renvoyée au suivant.
+
+        Args:
+            client: Client httpx partagé
+            payload: Corps JSON de la requête
+            size: Longueur du texte à corriger, en caractères
+
+        Returns:
+            Contenu complet généré par le modèle
+
+        Raises:
+            asyncio.TimeoutError: Si le second essai expire également
+            httpx.HTTPError: En cas d'erreur de connexion ou HTTP persistante
+        """
+        body = orjson.dumps({**payload, "stream": True})
+        timeout = self._current_timeout(size)
+        timeout_retried = False
+        failovers_left = len(self._endpoints) - 1
+        
+        while True:
+            endpoint = self._pick_endpoint()
+            if endpoint.semaphore is None:
+                endpoint.semaphore = asyncio.Semaphore(endpoint.limit)
+            
+            endpoint.inflight += 1
+            try:
+                async with endpoint.semaphore:
+                    start = time.perf_counter()
+                    # Délai sur la durée totale de la réponse, comme les
+                    # latences mesurées pour `_current_timeout`
+                    parts = await asyncio.wait_for(
+                        self._astream_completion(client, endpoint.url, body),
+                        timeout=timeout
+                    )
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                if timeout_retried:
+                    raise
+                timeout_retried = True
+                logger.warning(f"Timeout après {timeout:.0f}s, nouvel essai avec {2 * timeout:.0f}s")
+                timeout *= 2
+                continue
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                    raise
+                endpoint.unhealthy_until = time.monotonic() + self.cool_down_s
+                if failovers_left <= 0:
+                    raise
+                failovers_left -= 1
+                logger.warning(f"Serveur {endpoint.url} indisponible ({e}), bascule vers un autre serveur")
+                continue
+            finally:
+                endpoint.inflight -= 1
+            
+            self._latencies.append((time.perf_counter() - start) / max(size, 1))
+            return "".join(parts)
+
+    def correct_text(self, text: str) -> str:
+        """
+        Corrige un segment de texte via l'API LLM.
+
+        Args:
+            text: Texte à corriger
+
+        Returns:
+            Texte corrigé (ou texte original en cas d'erreur)
+        """
+        cached = self._cache_get(text)
+        if cached is not None:
+            logger.debug("Segment trouvé dans le cache")
+            return cached
+        
+        try:
+            for strict in (False, True):
+                content = self._post_completion(self._build_payload(text, strict=strict), len(text))
+                try:
+                    corrected = self._parse_response(content)
+                    break
+                except ValueError as e:
+                    if strict:
+                        raise
+                    logger.warning(f"Réponse JSON invalide ({e}), nouvel essai")
+            
+            if not corrected:
+                logger.error("Réponse vide de l'API")
                 return text
             
-            corrected = data["choices"][0]["message"]["content"].strip()
+            self._cache_set(text, corrected)
             return corrected
             
         except Timeout:
-            logger.error(f"Timeout après {self.timeout}s - texte trop long ou serveur occupé")
+            logger.error("Timeout malgré un second essai - texte trop long ou serveur occupé")
             return text
         except RequestException as e:
             logger.error(f"Erreur de connexion à l'API: {e}")
             return text
+        except ValueError as e:
+            logger.error(f"Réponse JSON invalide: {e}")
+            return text
         except (KeyError, IndexError) as e:
             logger.error(f"Erreur de structure de réponse: {e}")
             return text
@@ -174,64 +985,573 @@ Ne change pas la structure ni le contenu, corrige uniquement les erreurs OCR.
             logger.error(f"Erreur inattendue: {e}")
             return text
 
-    def correct_full_text(
+    async def acorrect_text(self, client: httpx.AsyncClient, text: str) -> str:
+        """
+        Version asynchrone de `correct_text`.
+
+        Args:
+            client: Client httpx partagé entre les segments
+            text: Texte à corriger
+
+        Returns:
+            Texte corrigé (ou texte original en cas d'erreur)
+        """
+        cached = self._cache_get(text)
+        if cached is not None:
+            logger.debug("Segment trouvé dans le cache")
+            return cached
+        
+        try:
+            for strict in (False, True):
+                content = await self._apost_completion(
+                    client, self._build_payload(text, strict=strict), len(text)
+                )
+                try:
+                    corrected = self._parse_response(content)
+                    break
+                except ValueError as e:
+                    if strict:
+                        raise
+                    logger.warning(f"Réponse JSON invalide ({e}), nouvel essai")
+            
+            if not corrected:
+                logger.error("Réponse vide de l'API")
+                return text
+            
+            self._cache_set(text, corrected)
+            return corrected
+            
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            logger.error("Timeout malgré un second essai - texte trop long ou serveur occupé")
+            return text
+        except httpx.HTTPError as e:
+            logger.error(f"Erreur de connexion à l'API: {e}")
+            return text
+        except ValueError as e:
+            logger.error(f"Réponse JSON invalide: {e}")
+            return text
+        except (KeyError, IndexError) as e:
+            logger.error(f"Erreur de structure de réponse: {e}")
+            return text
+        except Exception as e:
+            logger.error(f"Erreur inattendue: {e}")
+            return text
+
+    def correct_text_batch(self, texts: List[str]) -> List[str]:
+        """
+        Corrige plusieurs segments en une seule requête à l'API.
+
+        Si la réponse est inexploitable, chaque segment est corrigé
+        individuellement avec `correct_text`.
+
+        Args:
+            texts: Segments à corriger
+
+        Returns:
+            Segments corrigés (ou originaux en cas d'erreur), dans le même ordre
+        """
+        results = [self._cache_get(text) for text in texts]
+        todo = [k for k, result in enumerate(results) if result is None]
+        
+        if len(todo) == 1:
+            results[todo[0]] = self.correct_text(texts[todo[0]])
+        elif todo:
+            batch = [texts[k] for k in todo]
+            try:
+                content = self._post_completion(
+                    self._build_batch_payload(batch), sum(len(text) for text in batch)
+                )
+                items = self._parse_batch_response(content, len(batch))
+            except Exception as e:
+                logger.warning(f"Lot de {len(batch)} segments inexploitable ({e}), correction segment par segment")
+                items = [self.correct_text(text) for text in batch]
+            else:
+                items = self._finish_batch(batch, items)
+            
+            for k, item in zip(todo, items):
+                results[k] = item
+        
+        return results
+
+    async def acorrect_text_batch(
+        self,
+        client: httpx.AsyncClient,
+        texts: List[str]
+    ) -> List[str]:
+        """
+        Version asynchrone de `correct_text_batch`.
+
+        Args:
+            client: Client httpx partagé
+            texts: Segments à corriger
+
+        Returns:
+            Segments corrigés (ou originaux en cas d'erreur), dans le même ordre
+        """
+        results = [self._cache_get(text) for text in texts]
+        todo = [k for k, result in enumerate(results) if result is None]
+        
+        if len(todo) == 1:
+            results[todo[0]] = await self.acorrect_text(client, texts[todo[0]])
+        elif todo:
+            batch = [texts[k] for k in todo]
+            try:
+                content = await self._apost_completion(
+                    client, self._build_batch_payload(batch), sum(len(text) for text in batch)
+                )
+                items = self._parse_batch_response(content, len(batch))
+            except Exception as e:
+                logger.warning(f"Lot de {len(batch)} segments inexploitable ({e}), correction segment par segment")
+                items = [await self.acorrect_text(client, text) for text in batch]
+            else:
+                items = self._finish_batch(batch, items)
+            
+            for k, item in zip(todo, items):
+                results[k] = item
+        
+        return results
+
+    def _finish_batch(self, texts: List[str], items: List[str]) -> List[str]:
+        """
+        Met en cache les corrections d'un lot et remplace les réponses vides.
+
+        Args:
+            texts: Segments originaux du lot
+            items: Corrections renvoyées par le modèle
+
+        Returns:
+            Corrections, avec le texte original pour les réponses vides
+        """
+        finished = []
+        for text, item in zip(texts, items):
+            if item:
+                self._cache_set(text, item)
+                finished.append(item)
+            else:
+                finished.append(text)
+        return finished
+
+    @staticmethod
+    def _load_checkpoint(checkpoint_path: Path, chunks: List[str]) -> Dict[int, str]:
+        """
+        Charge les segments déjà corrigés lors d'une exécution précédente.
+
+        Seules les entrées dont le texte original correspond toujours au
+        segment de même numéro sont conservées.
+
+        Args:
+            checkpoint_path: Fichier JSONL de reprise
+            chunks: Segments du texte courant
+
+        Returns:
+            Dictionnaire numéro de segment (à partir de 1) -> texte corrigé
+        """
+        done = {}
+        if not checkpoint_path.exists():
+            return done
+        
+        with open(checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    index = entry["index"]
+                    if (1 <= index <= len(chunks)
+                            and entry["original_hash"] == _hash_text(chunks[index - 1])):
+                        done[index] = entry["corrected"]
+                except (ValueError, KeyError, TypeError):
+                    # Ligne tronquée par une interruption : ignorée
+                    continue
+        
+        return done
+
+    @staticmethod
+    def _write_checkpoint(checkpoint: TextIO, index: int, chunk: str, corrected: str) -> None:
+        """Ajoute un segment corrigé au fichier de reprise et le synchronise sur disque."""
+        entry = {"index": index, "original_hash": _hash_text(chunk), "corrected": corrected}
+        checkpoint.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+
+    async def _acorrect_unit(
         self,
-        text: str,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        unit: List[Tuple[int, str]],
+        total: int,
+        show_preview: bool,
+        checkpoint: Optional[TextIO] = None
+    ) -> List[str]:
+        """
+        Corrige un lot de segments en respectant la limite de concurrence.
+
+        Un lot d'un seul segment est envoyé tel quel ; les lots plus grands
+        sont regroupés en une seule requête.
+
+        Args:
+            client: Client httpx partagé
+            semaphore: Sémaphore limitant le nombre de requêtes en vol
+            unit: Couples (numéro à partir de 1, segment) du lot
+            total: Nombre total de segments
+            show_preview: Afficher un aperçu des segments
+            checkpoint: Fichier de reprise ouvert en ajout (optionnel)
+
+        Returns:
+            Textes corrigés des segments du lot, dans le même ordre
+        """
+        texts = [chunk for _, chunk in unit]
+        
+        async with semaphore:
+            for index, chunk in unit:
+                logger.info(f"Segment {index}/{total} ({len(chunk):,} caractères)")
+                
+                if show_preview:
+                    preview = chunk[:150] + "..." if len(chunk) > 150 else chunk
+                    logger.info(f"Aperçu: {preview}")
+            
+            if len(unit) == 1:
+                corrected = [await self.acorrect_text(client, texts[0])]
+            else:
+                corrected = await self.acorrect_text_batch(client, texts)
+        
+        # Vérifier si la correction a fonctionné
+        for (index, chunk), corrected_chunk in zip(unit, corrected):
+            if corrected_chunk != chunk:
+                logger.info(f"✓ Segment {index} corrigé avec succès")
+                if checkpoint is not None:
+                    self._write_checkpoint(checkpoint, index, chunk, corrected_chunk)
+            else:
+                logger.warning(f"⚠ Segment {index} inchangé (erreur possible)")
+        
+        return corrected
+
+    def _needs_correction(self, text: str) -> bool:
+        """
+        Indique si un segment présente des traces d'erreurs OCR.
+
+        Heuristique rapide : proportion de caractères parasites (caractères
+        de contrôle ou invisibles hors espaces, `|`, `~`, `^`, `` ` ``) et
+        chiffres collés à l'intérieur d'un mot ("c0rrection").
+
+        Args:
+            text: Segment à examiner
+
+        Returns:
+            False si le segment paraît déjà propre et peut être conservé tel quel
+        """
+        if _DIGIT_IN_WORD.search(text):
+            return True
+        
+        artifacts = sum(
+            1 for c in text
+            if c in _OCR_ARTIFACT_CHARS
+            or (unicodedata.category(c)[0] == "C" and not c.isspace())
+        )
+        return artifacts / max(len(text), 1) >= _ARTIFACT_RATIO_THRESHOLD
+
+    def _estimate_tokens(self) -> Callable[[str], int]:
+        """
+        Retourne une fonction estimant le nombre de tokens d'un texte.
+
+        Returns:
+            Le décompte exact si un tokenizer est configuré, sinon une
+            estimation prudente à partir du nombre de caractères
+        """
+        if self.tokenizer is not None:
+            return self._measure()
+        return lambda s: math.ceil(len(s) / _CHARS_PER_TOKEN)
+
+    def _group_into_batches(
+        self,
+        items: List[Tuple[int, str]],
+        batch_size: int
+    ) -> List[List[Tuple[int, str]]]:
+        """
+        Regroupe des segments consécutifs en lots envoyés en une seule requête.
+
+        Un lot contient au plus `batch_size` segments et sa taille cumulée
+        estimée ne dépasse pas `max_tokens`, afin que la réponse du modèle
+        puisse contenir tous les segments corrigés.
+
+        Args:
+            items: Couples (numéro, segment) à regrouper
+            batch_size: Nombre maximal de segments par lot
+
+        Returns:
+            Liste de lots, dans l'ordre des segments
+        """
+        if batch_size <= 1:
+            return [[item] for item in items]
+        
+        estimate = self._estimate_tokens()
+        batches = []
+        current: List[Tuple[int, str]] = []
+        current_size = 0
+        
+        for item in items:
+            size = estimate(item[1])
+            if current and (len(current) >= batch_size or current_size + size > self.max_tokens):
+                batches.append(current)
+                current = []
+                current_size = 0
+            current.append(item)
+            current_size += size
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+
+    def _length_bins(
+        self,
+        units: List[List[Tuple[int, str]]],
+        bins: int
+    ) -> List[Tuple[List[List[Tuple[int, str]]], int]]:
+        """
+        Répartit les lots de segments en classes de longueur homogène.
+
+        Les lots sont triés par longueur puis découpés en `bins` groupes
+        d'effectif égal (quantiles). Les groupes plus longs que la moyenne
+        reçoivent une limite de concurrence réduite en proportion ; les
+        autres utilisent toute la capacité des serveurs (les limites de
+        chaque serveur s'appliquent de toute façon).
+
+        Args:
+            units: Lots de couples (numéro, segment) à répartir
+            bins: Nombre de classes souhaité
+
+        Returns:
+            Liste de couples (lots de la classe, limite de concurrence),
+            du plus court au plus long
+        """
+        if not units:
+            return []
+        
+        def unit_len(unit: List[Tuple[int, str]]) -> int:
+            return sum(len(chunk) for _, chunk in unit)
+        
+        ordered = sorted(units, key=unit_len)
+        size = math.ceil(len(ordered) / max(bins, 1))
+        mean_len = sum(unit_len(unit) for unit in ordered) / len(ordered)
+        
+        waves = []
+        for start in range(0, len(ordered), size):
+            group = ordered[start:start + size]
+            group_mean = max(sum(unit_len(unit) for unit in group) / len(group), 1)
+            limit = round(self._total_concurrency * mean_len / group_mean)
+            waves.append((group, min(max(limit, 1), self._total_concurrency)))
+        
+        return waves
+
+    async def acorrect_full_text(
+        self,
+        text: Union[str, Iterable[str]],
+        out_fp: TextIO,
         max_chars: int = 1500,
-        show_preview: bool = True
-    ) -> str:
+        show_preview: bool = True,
+        checkpoint_path: Optional[Path] = None,
+        bins: int = 1,
+        batch_size: int = 1,
+        always_correct: bool = False
+    ) -> int:
         """
-        Corrige un texte complet en le divisant en segments.
+        Corrige un texte complet en envoyant les segments en parallèle.
+
+        Les segments sont soumis simultanément à l'API (dans la limite de
+        `max_concurrency` par serveur) et écrits dans `out_fp` dans leur
+        ordre d'origine dès qu'ils sont disponibles, sans garder tout le
+        texte corrigé en mémoire.
+
+        Les segments identiques ne sont envoyés qu'une fois, et ceux qui
+        ne présentent aucune trace d'erreur OCR sont conservés tels quels
+        (voir `_needs_correction`).
 
         Args:
-            text: Texte complet à corriger
+            text: Texte complet à corriger, ou suite de ses paragraphes
+            out_fp: Fichier de sortie ouvert en écriture
             max_chars: Taille maximale des segments
             show_preview: Afficher un aperçu de chaque segment
+            checkpoint_path: Fichier JSONL de reprise ; les segments qui y
+                figurent déjà ne sont pas renvoyés à l'API
+            bins: Nombre de classes de longueur traitées en vagues successives
+            batch_size: Nombre maximal de segments regroupés par requête
+            always_correct: Envoyer tous les segments à l'API, même ceux
+                qui paraissent déjà propres
 
         Returns:
-            Texte complet corrigé
+            Nombre de caractères écrits
         """
-        logger.info(f"Texte original: {len(text):,} caractères")
+        if isinstance(text, str):
+            logger.info(f"Texte original: {len(text):,} caractères")
+            paragraphs = text.split(_PARAGRAPH_SEP)
+        else:
+            paragraphs = text
         
         # Diviser en segments
-        chunks = self.split_text_into_chunks(text, max_chars=max_chars)
+        chunks = self.split_paragraphs_into_chunks(paragraphs, max_chars=max_chars)
         logger.info(f"Divisé en {len(chunks)} segment(s)")
         
-        corrected_chunks = []
+        writer = _OrderedChunkWriter(out_fp)
+        
+        # Reprise : segments déjà corrigés lors d'une exécution précédente
+        done = {}
+        if checkpoint_path is not None:
+            done = self._load_checkpoint(checkpoint_path, chunks)
+            if done:
+                logger.info(f"Reprise: {len(done)} segment(s) déjà corrigé(s)")
+        
+        for i, corrected in done.items():
+            writer.add(i, corrected)
+        
+        # Segments identiques (en-têtes, pieds de page répétés...) : un seul
+        # envoi par texte, le résultat est recopié aux autres positions
+        known = {chunks[i - 1]: corrected for i, corrected in done.items()}
+        first_index: Dict[str, int] = {}
+        copies: Dict[int, List[int]] = collections.defaultdict(list)
+        pending = []
+        remaining = 0
+        clean = 0
         
         for i, chunk in enumerate(chunks, 1):
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Segment {i}/{len(chunks)} ({len(chunk):,} caractères)")
-            logger.info(f"{'='*60}")
-            
-            if show_preview:
-                preview = chunk[:150] + "..." if len(chunk) > 150 else chunk
-                logger.info(f"Aperçu: {preview}")
-            
+            if i in done:
+                continue
+            if chunk in known:
+                writer.add(i, known[chunk])
+                continue
+            if not always_correct and not self._needs_correction(chunk):
+                writer.add(i, chunk)
+                clean += 1
+                continue
+            remaining += 1
+            first = first_index.setdefault(chunk, i)
+            if first == i:
+                pending.append((i, chunk))
+            else:
+                copies[first].append(i)
+        
+        if clean:
+            logger.info(f"Segments déjà propres, conservés tels quels: {clean}")
+        
+        if len(pending) < remaining:
+            logger.info(
+                f"Segments uniques: {len(pending)}/{remaining} "
+                f"({len(pending) / remaining:.0%}), doublons non renvoyés"
+            )
+        
+        # Regroupement de petits segments consécutifs en une seule requête
+        units = self._group_into_batches(pending, batch_size)
+        if len(units) < len(pending):
+            logger.info(f"Regroupés en {len(units)} requête(s)")
+        
+        # Vagues successives de lots de longueur comparable, pour que
+        # les lots courts n'attendent pas derrière les plus longs
+        if bins > 1:
+            waves = self._length_bins(units, bins)
+        else:
+            waves = [(units, self._total_concurrency)]
+        
+        self._reset_endpoints()
+        max_connections = max((limit for _, limit in waves), default=self._total_concurrency)
+        # HTTP/2 (via ALPN, donc en HTTPS) : les requêtes concurrentes
+        # partagent une même connexion ; sinon repli sur HTTP/1.1
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        checkpoint = (
+            open(checkpoint_path, "a", encoding="utf-8")
+            if checkpoint_path is not None else None
+        )
+        
+        async def correct_and_write(
+            client: httpx.AsyncClient,
+            semaphore: asyncio.Semaphore,
+            unit: List[Tuple[int, str]]
+        ) -> None:
             try:
-                corrected_chunk = self.correct_text(chunk)
-                corrected_chunks.append(corrected_chunk)
-                
-                # Vérifier si la correction a fonctionné
-                if corrected_chunk != chunk:
-                    logger.info(f"✓ Segment {i} corrigé avec succès")
-                else:
-                    logger.warning(f"⚠ Segment {i} inchangé (erreur possible)")
-                    
+                corrected = await self._acorrect_unit(
+                    client, semaphore, unit, len(chunks), show_preview, checkpoint
+                )
             except Exception as e:
-                logger.error(f"✗ Erreur segment {i}: {str(e)}")
+                indexes = ", ".join(str(i) for i, _ in unit)
+                logger.error(f"✗ Erreur segment {indexes}: {str(e)}")
                 logger.warning("  → Utilisation du texte original")
-                corrected_chunks.append(chunk)
+                corrected = [chunk for _, chunk in unit]
+            
+            for (i, _), corrected_chunk in zip(unit, corrected):
+                writer.add(i, corrected_chunk)
+                for j in copies.get(i, ()):
+                    writer.add(j, corrected_chunk)
+        
+        try:
+            async with httpx.AsyncClient(
+                http2=self._http2_available(), limits=limits, timeout=None
+            ) as client:
+                for wave_num, (wave, limit) in enumerate(waves, 1):
+                    if len(waves) > 1:
+                        logger.info(
+                            f"Vague {wave_num}/{len(waves)}: {len(wave)} requête(s), "
+                            f"{limit} en parallèle"
+                        )
+                    
+                    semaphore = asyncio.Semaphore(limit)
+                    await asyncio.gather(
+                        *(correct_and_write(client, semaphore, unit) for unit in wave)
+                    )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
         
-        # Recombiner
-        final_text = "\n\n".join(corrected_chunks)
         logger.info(f"\n{'='*60}")
         logger.info(f"✓ Traitement terminé")
-        logger.info(f"  - Total: {len(final_text):,} caractères")
-        logger.info(f"  - Segments: {len(corrected_chunks)}")
+        logger.info(f"  - Total: {writer.chars_written:,} caractères")
+        logger.info(f"  - Segments: {len(chunks)}")
         logger.info(f"{'='*60}")
         
-        return final_text
+        return writer.chars_written
+
+    def correct_full_text(
+        self,
+        text: Union[str, Iterable[str]],
+        out_fp: TextIO,
+        max_chars: int = 1500,
+        show_preview: bool = True,
+        checkpoint_path: Optional[Path] = None,
+        bins: int = 1,
+        batch_size: int = 1,
+        always_correct: bool = False
+    ) -> int:
+        """
+        Corrige un texte complet en le divisant en segments.
+
+        Enveloppe synchrone de `acorrect_full_text`.
+
+        Args:
+            text: Texte complet à corriger, ou suite de ses paragraphes
+            out_fp: Fichier de sortie ouvert en écriture
+            max_chars: Taille maximale des segments
+            show_preview: Afficher un aperçu de chaque segment
+            checkpoint_path: Fichier JSONL de reprise ; les segments qui y
+                figurent déjà ne sont pas renvoyés à l'API
+            bins: Nombre de classes de longueur traitées en vagues successives
+            batch_size: Nombre maximal de segments regroupés par requête
+            always_correct: Envoyer tous les segments à l'API, même ceux
+                qui paraissent déjà propres
+
+        Returns:
+            Nombre de caractères écrits
+        """
+        return asyncio.run(
+            self.acorrect_full_text(
+                text,
+                out_fp,
+                max_chars=max_chars,
+                show_preview=show_preview,
+                checkpoint_path=checkpoint_path,
+                bins=bins,
+                batch_size=batch_size,
+                always_correct=always_correct
+            )
+        )
 
 
 def main():
@@ -246,7 +1566,14 @@ Exemples:
   %(prog)s extracted_text.txt
   %(prog)s extracted_text.txt -o texte_propre.txt
   %(prog)s extracted_text.txt -m 2000
+  %(prog)s extracted_text.txt -c 16 --bins 4
+  %(prog)s extracted_text.txt --batch-size 4
+  %(prog)s extracted_text.txt --always-correct
+  %(prog)s extracted_text.txt --tokenizer o200k_base -m 1024
+  %(prog)s extracted_text.txt --temperature 0 --cache-dir .cache
+  %(prog)s extracted_text.txt --checkpoint reprise.jsonl
   %(prog)s extracted_text.txt --api-url http://localhost:1234/v1/chat/completions
+  %(prog)s extracted_text.txt --api-url http://pc1:1234/v1/chat/completions --api-url http://pc2:1234/v1/chat/completions
         """
     )
     
@@ -268,10 +1595,34 @@ Exemples:
         default=1500,
         help="Taille max des segments (défaut: 1500)"
     )
+    parser.add_argument(
+        "--bins",
+        type=int,
+        default=1,
+        help="Nombre de classes de longueur traitées en vagues successives (défaut: 1)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Nombre max de segments regroupés dans une même requête (défaut: 1)"
+    )
+    parser.add_argument(
+        "--always-correct",
+        action="store_true",
+        help="Envoyer tous les segments au modèle, même ceux qui paraissent déjà propres"
+    )
+    parser.add_argument(
+        "--tokenizer",
+        default=None,
+        help="Encodage tiktoken ou modèle Hugging Face : -m est alors exprimé en tokens"
+    )
     parser.add_argument(
         "--api-url",
-        default="http://192.168.1.22:1234/v1/chat/completions",
-        help="URL de l'API LM Studio"
+        action="append",
+        default=None,
+        help="URL de l'API LM Studio (défaut: http://192.168.1.22:1234/v1/chat/completions) ; "
+             "répéter l'option pour répartir la charge entre plusieurs serveurs"
     )
     parser.add_argument(
         "--model",
@@ -284,6 +1635,34 @@ Exemples:
         default=0.2,
         help="Température de génération (0.0-1.0, défaut: 0.2)"
     )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=8,
+        help="Nombre de segments corrigés en parallèle par serveur (défaut: 8)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(".clean_text_cache"),
+        help="Dossier du cache des réponses (défaut: .clean_text_cache)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Désactiver le cache des réponses"
+    )
+    parser.add_argument(
+        "--cache-nondeterministic",
+        action="store_true",
+        help="Utiliser le cache même avec une température > 0"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="Fichier JSONL de reprise pour continuer un traitement interrompu"
+    )
     parser.add_argument(
         "--no-preview",
         action="store_true",
@@ -297,6 +1676,9 @@ Exemples:
 
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        parser.error("--concurrency doit être supérieur ou égal à 1")
+
     # Configuration du niveau de log
     if args.verbose:
         logger.setLevel(logging.DEBUG)
@@ -332,31 +1714,39 @@ Exemples:
         output_path = input_path.parent / f"{input_path.stem}_corrected.txt"
 
     try:
-        # Lire le texte d'entrée
-        text = input_path.read_text(encoding="utf-8")
+        # Lire le texte d'entrée paragraphe par paragraphe
+        paragraphs = iter_paragraphs(input_path)
         
         # Créer le correcteur et traiter le texte
-        corrector = TextCorrector(
-            api_url=args.api_url,
+        with TextCorrector(
+            api_urls=args.api_url,
             model=args.model,
-            temperature=args.temperature
-        )
-        
-        corrected_text = corrector.correct_full_text(
-            text,
-            max_chars=args.max_chars,
-            show_preview=not args.no_preview
-        )
-        
-        # Sauvegarder le résultat
-        output_path.write_text(corrected_text, encoding="utf-8")
+            temperature=args.temperature,
+            max_concurrency=args.concurrency,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            cache_nondeterministic=args.cache_nondeterministic,
+            tokenizer=args.tokenizer
+        ) as corrector, open(output_path, "w", encoding="utf-8", buffering=1 << 20) as out_fp:
+            # Les segments corrigés sont écrits au fur et à mesure
+            corrector.correct_full_text(
+                paragraphs,
+                out_fp,
+                max_chars=args.max_chars,
+                show_preview=not args.no_preview,
+                checkpoint_path=args.checkpoint,
+                bins=args.bins,
+                batch_size=args.batch_size,
+                always_correct=args.always_correct
+            )
         
         logger.info(f"\n✓ Texte corrigé sauvegardé: {output_path}")
         
         # Afficher un aperçu
         logger.info("\nAperçu du résultat:")
         logger.info("-" * 60)
-        preview = corrected_text[:500] + "..." if len(corrected_text) > 500 else corrected_text
+        with open(output_path, encoding="utf-8") as f:
+            preview = f.read(501)
+        preview = preview[:500] + "..." if len(preview) > 500 else preview
         print(preview)
         
     except Exception as e:
@@ -5,16 +5,30 @@ Ce module permet d'extraire le texte natif d'un PDF ainsi que le texte
 des images intégrées via OCR (Tesseract).
 """
 
-import io
+import hashlib
 import logging
 import os
+import queue
 import sys
+import tempfile
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, TextIO, Tuple, Union
+
+# Tesseract (via OpenMP) est souvent plus lent en multithread : un seul
+# thread par appel, le parallélisme venant des threads OCR. À définir avant
+# le chargement de libgomp par tesserocr ; une valeur déjà fixée dans
+# l'environnement est conservée.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
 
 import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
+
+# pytesseract, PIL et tesserocr ne sont importés qu'à la première image
+# passée à l'OCR : un PDF sans image n'en paie pas le chargement
+if TYPE_CHECKING:
+    from PIL import Image
 
 # Configuration du logging
 logging.basicConfig(
@@ -26,34 +40,184 @@ logger = logging.getLogger(__name__)
 # Chemin par défaut de Tesseract pour Windows
 DEFAULT_TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
+# Nombre maximal de threads OCR par défaut
+DEFAULT_MAX_WORKERS = 4
+
+# Nombre de pages lues d'avance en attente d'OCR
+PAGE_QUEUE_SIZE = 8
+
+# Nombre maximal d'images par appel groupé de Tesseract (au-delà,
+# Tesseract peut se bloquer en mode liste)
+MAX_IMAGES_PER_BATCH = 50
+
+# En deçà de ces dimensions (ou au-delà de ce rapport largeur/hauteur),
+# une image ne contient vraisemblablement pas de texte : masques,
+# aplats de couleur, icônes, filets décoratifs
+MIN_IMAGE_WIDTH = 100
+MIN_IMAGE_HEIGHT = 32
+MIN_IMAGE_AREA = 10_000
+MAX_IMAGE_ASPECT_RATIO = 50
+
+# Mode de segmentation Tesseract par défaut : 6 = un bloc de texte uniforme,
+# sans analyse de la mise en page (3 = segmentation automatique complète)
+DEFAULT_PSM = 6
+
+# Mode de segmentation des pages entières (pages numérisées) : analyse
+# complète de la mise en page, pour ne pas fusionner les colonnes
+FULL_PAGE_PSM = 3
+
+# Résolution du rendu des zones d'image passées à l'OCR
+RENDER_DPI = 200
+
+# Options d'analyse d'une page : celles de `get_text("text")`, plus le
+# repérage des images (cadre et dimensions, sans décodage ni copie)
+TEXTPAGE_FLAGS = fitz.TEXTFLAGS_TEXT | fitz.TEXT_PRESERVE_IMAGES
+
+# Clé d'une image dans le cache OCR : l'empreinte des pixels de son rendu
+# (deux zones ne partagent un texte OCR que si leurs rendus sont
+# identiques) ; (page, 0) désigne le rendu d'une page entière
+ImageKey = Union[bytes, Tuple[int, int]]
+
+
+@dataclass
+class _PageWork:
+    """Page lue par le producteur, en attente d'OCR puis d'écriture."""
+    page_num: int
+    native_text: str
+    # Clés des images de la page à inclure, dans l'ordre
+    keys: List[ImageKey]
+    # Images à passer à l'OCR : (index dans la page, clé, rendu de la zone)
+    images: List[Tuple[int, ImageKey, "Image.Image"]] = field(default_factory=list)
+
 
 class PDFTextExtractor:
     """Extracteur de texte pour fichiers PDF avec support OCR."""
 
-    def __init__(self, tesseract_path: Optional[str] = None, languages: str = "fra+eng"):
+    def __init__(self, tesseract_path: Optional[str] = None, languages: str = "fra+eng",
+                 workers: Optional[int] = None, ocr: bool = True, binarize: bool = True,
+                 psm: int = DEFAULT_PSM, mupdf_ocr: bool = False):
         """
         Initialise l'extracteur de texte PDF.
 
         Args:
             tesseract_path: Chemin vers l'exécutable Tesseract (optionnel)
             languages: Langues pour l'OCR, séparées par '+' (défaut: "fra+eng")
+            workers: Nombre de threads OCR en parallèle
+                (défaut: nombre de cœurs, 4 au maximum)
+            ocr: Passer les images à l'OCR ; si False, seul le texte natif
+                est extrait
+            binarize: Binariser les images avec NumPy avant l'OCR (ignoré si
+                NumPy n'est pas installé)
+            psm: Mode de segmentation de Tesseract pour les zones d'image
+                (défaut: 6, un bloc de texte ; 3 pour les mises en page
+                complexes) ; les pages numérisées, passées en entier,
+                utilisent toujours `FULL_PAGE_PSM`
+            mupdf_ocr: Confier l'OCR des images au Tesseract intégré à
+                PyMuPDF (`Page.get_textpage_ocr`), une page par appel ; en cas
+                d'échec (PyMuPDF trop ancien, tessdata introuvable), l'OCR
+                habituel est utilisé
+
+        Note:
+            Chaque appel à Tesseract est limité à un thread OpenMP
+            (`OMP_THREAD_LIMIT=1`, fixé au chargement du module) : sans cela,
+            chaque image lancerait autant de threads que de cœurs et les
+            threads OCR se disputeraient le processeur. Pour un seul gros
+            document traité sans parallélisme (`workers=1`), définir
+            `OMP_THREAD_LIMIT` avant de lancer le script.
         """
+        self.tesseract_path = tesseract_path
         self.languages = languages
+        # Texte OCR par image, propre au document en cours
+        self._ocr_cache: Dict[ImageKey, str] = {}
+        # API tesserocr propre à chaque thread OCR (voir _get_api)
+        self._local = threading.local()
+        self._use_tesserocr = True
+        self.workers = max(1, workers if workers is not None else min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS))
+        self.ocr = ocr
+        self.binarize = binarize
+        self.psm = psm
+        self.mupdf_ocr = mupdf_ocr
+        # Moteur LSTM seul et sans essai de l'image inversée : le plus rapide
+        self.tess_config = f"--psm {psm} --oem 1 -c tessedit_do_invert=0"
+        self.page_tess_config = f"--psm {FULL_PAGE_PSM} --oem 1 -c tessedit_do_invert=0"
+
+    def close(self) -> None:
+        """Libère l'API Tesseract en mémoire du thread courant, si elle a été chargée."""
+        api = getattr(self._local, "api", None)
+        if api is not None:
+            api.End()
+            self._local.api = None
+
+    def __enter__(self) -> "PDFTextExtractor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _pytesseract(self):
+        """
+        Importe pytesseract (au premier appel) et lui indique l'exécutable Tesseract.
+
+        Returns:
+            Module pytesseract
+        """
+        import pytesseract
         
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        if self.tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
         elif sys.platform == 'win32':
             pytesseract.pytesseract.tesseract_cmd = DEFAULT_TESSERACT_PATH
+        return pytesseract
+
+    def _get_api(self):
+        """
+        Retourne l'API tesserocr du thread courant, chargée au premier appel.
 
-    def extract_text_from_pdf(self, pdf_path: Path) -> str:
+        Une instance de `PyTessBaseAPI` ne peut pas servir à deux threads
+        en même temps : chaque thread OCR a la sienne.
+
+        Returns:
+            Instance de `tesserocr.PyTessBaseAPI`, ou None si tesserocr n'est
+            pas installé ou ne peut pas être initialisé (pytesseract est
+            alors utilisé)
+        """
+        api = getattr(self._local, "api", None)
+        if api is None and self._use_tesserocr:
+            try:
+                # API Tesseract en mémoire (optionnelle) : le modèle de langue
+                # n'est chargé qu'une fois, sans lancer un processus par image
+                import tesserocr
+            except ImportError:
+                self._use_tesserocr = False
+                return None
+            
+            try:
+                api = tesserocr.PyTessBaseAPI(
+                    lang=self.languages, psm=self.psm, oem=tesserocr.OEM.LSTM_ONLY
+                )
+                api.SetVariable("tessedit_do_invert", "0")
+                self._local.api = api
+                logger.debug("Tesseract chargé en mémoire (tesserocr)")
+            except Exception as e:
+                self._use_tesserocr = False
+                logger.warning(f"tesserocr inutilisable ({e}), utilisation de pytesseract")
+        return api
+
+    def extract_text_from_pdf(self, pdf_path: Path, out: TextIO) -> int:
         """
         Extrait tout le texte d'un PDF (natif + OCR sur images).
 
+        Un thread lit les pages avec PyMuPDF (texte natif et images) pendant
+        que `workers` threads effectuent l'OCR : la lecture du PDF se fait
+        en temps masqué. Le texte est écrit dans `out` dans l'ordre des
+        pages, au fur et à mesure, sans garder tout le document en mémoire.
+
         Args:
             pdf_path: Chemin vers le fichier PDF
+            out: Fichier de sortie ouvert en écriture
 
         Returns:
-            Texte extrait complet
+            Nombre de caractères écrits
 
         Raises:
             FileNotFoundError: Si le PDF n'existe pas
@@ -70,69 +234,564 @@ class PDFTextExtractor:
             logger.error(f"PDF corrompu ou invalide: {e}")
             raise
 
-        all_text = []
         total_pages = len(doc)
         logger.info(f"Traitement de {total_pages} page(s)...")
+        
+        # Les xrefs ne sont valables que dans ce document
+        self._ocr_cache.clear()
+
+        chars_written = 0
+        
+        def write_page(work: _PageWork) -> None:
+            # Séparateur avant chaque texte sauf le premier : même résultat
+            # que "\n\n".join() sur l'ensemble des textes
+            nonlocal chars_written
+            texts = [work.native_text]
+            for key in work.keys:
+                # Une clé (page, 0) ne sert qu'à sa page : elle est retirée
+                # du cache, seuls les rendus susceptibles de réapparaître
+                # y restent
+                if isinstance(key, tuple):
+                    texts.append(self._ocr_cache.pop(key, ""))
+                else:
+                    texts.append(self._ocr_cache.get(key, ""))
+            for text in texts:
+                if not text.strip():
+                    continue
+                if chars_written:
+                    out.write("\n\n")
+                    chars_written += 2
+                out.write(text)
+                chars_written += len(text)
+
+        # File bornée : le producteur n'avance pas plus de PAGE_QUEUE_SIZE
+        # pages devant l'OCR, ce qui limite la mémoire occupée par les images
+        tasks: queue.Queue = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+        results: queue.Queue = queue.Queue()
+        consumers = min(self.workers, max(total_pages, 1))
+        logger.debug(f"OCR sur {consumers} thread(s)")
+        
+        threads = [
+            threading.Thread(
+                target=self._produce_pages,
+                args=(doc, total_pages, tasks, results, consumers),
+                daemon=True
+            )
+        ]
+        # Le modèle de langue n'est préchargé que si le document contient
+        # des images : un PDF purement textuel n'en paie pas le coût
+        preload = self.ocr and not self.mupdf_ocr and self._has_images(doc)
+        threads.extend(
+            threading.Thread(target=self._consume_pages, args=(tasks, results, preload), daemon=True)
+            for _ in range(consumers)
+        )
+        for thread in threads:
+            thread.start()
+        
+        # Les pages terminent dans le désordre : elles sont écrites dès que
+        # toutes les pages précédentes l'ont été
+        ready: Dict[int, _PageWork] = {}
+        next_page = 1
+        while next_page <= total_pages:
+            item = results.get()
+            if isinstance(item, BaseException):
+                raise item
+            ready[item.page_num] = item
+            while next_page in ready:
+                write_page(ready.pop(next_page))
+                next_page += 1
+        
+        for thread in threads:
+            thread.join()
+        
+        logger.info(f"Extraction terminée: {chars_written} caractères")
+        return chars_written
 
-        for page_num, page in enumerate(doc, start=1):
-            logger.debug(f"Page {page_num}/{total_pages}")
+    def _produce_pages(self, doc: fitz.Document, total_pages: int, tasks: queue.Queue,
+                       results: queue.Queue, consumers: int) -> None:
+        """
+        Producteur : lit chaque page et la transmet aux threads OCR.
+
+        Seul ce thread accède au document PyMuPDF, qui n'est pas prévu pour
+        être partagé entre threads. Une erreur est transmise au thread
+        principal via `results`.
+
+        Args:
+            doc: Document PDF ouvert (fermé à la fin)
+            total_pages: Nombre total de pages
+            tasks: File des pages à traiter
+            results: File des pages traitées
+            consumers: Nombre de threads OCR à arrêter à la fin
+        """
+        # Images déjà transmises : chacune n'est passée à l'OCR qu'une fois
+        seen: Set[ImageKey] = set()
+        try:
+            for page_num in range(1, total_pages + 1):
+                tasks.put(self._read_page(doc, page_num, total_pages, seen))
+        except BaseException as e:
+            results.put(e)
+        finally:
+            doc.close()
+            for _ in range(consumers):
+                tasks.put(None)
+
+    def _consume_pages(self, tasks: queue.Queue, results: queue.Queue, preload: bool = False) -> None:
+        """
+        Consommateur : effectue l'OCR des images de chaque page reçue.
+
+        Une erreur inattendue est transmise au thread principal via
+        `results`, comme pour le producteur.
+
+        Args:
+            tasks: File des pages à traiter (None pour s'arrêter)
+            results: File des pages traitées
+            preload: Charger l'API Tesseract du thread dès son démarrage,
+                pendant que le producteur lit les premières pages, plutôt
+                qu'à la première image
+        """
+        try:
+            if preload:
+                self._get_api()
             
-            # Extraction du texte natif
-            native_text = page.get_text("text")
-            if native_text.strip():
-                all_text.append(native_text)
-
-            # OCR sur les images embarquées
-            image_list = page.get_images(full=True)
-            if image_list:
-                logger.debug(f"  - {len(image_list)} image(s) détectée(s)")
+            while True:
+                work = tasks.get()
+                if work is None:
+                    return
                 
-            for img_index, img in enumerate(image_list, start=1):
                 try:
-                    ocr_text = self._extract_text_from_image(doc, img[0], page_num, img_index)
-                    if ocr_text.strip():
-                        all_text.append(ocr_text)
+                    self._ocr_images(work.images, work.page_num)
+                except Exception as e:
+                    logger.warning(f"  - Erreur OCR page {work.page_num}: {e}")
+                
+                # Les images ne sont plus utiles une fois traitées
+                work.images.clear()
+                results.put(work)
+        except BaseException as e:
+            results.put(e)
+        finally:
+            self.close()
+
+    @staticmethod
+    def _has_images(doc: fitz.Document) -> bool:
+        """
+        Indique si le document contient au moins un objet image.
+
+        Seuls les dictionnaires des objets sont lus, sans analyser le
+        contenu des pages ; les images incorporées au contenu d'une page
+        (sans xref) ne sont pas détectées.
+
+        Args:
+            doc: Document PDF ouvert
+
+        Returns:
+            True si un objet image est trouvé
+        """
+        for xref in range(1, doc.xref_length()):
+            try:
+                if doc.xref_get_key(xref, "Subtype")[1] == "/Image":
+                    return True
+            except Exception:
+                continue
+        return False
+
+    def _read_page(self, doc: fitz.Document, page_num: int, total_pages: int,
+                   seen: Set[ImageKey]) -> _PageWork:
+        """
+        Lit le texte natif d'une page et rend les zones d'image à passer à l'OCR.
+
+        Chaque image affichée est rendue telle qu'elle apparaît sur la page
+        (`get_pixmap` limité à son cadre, à `RENDER_DPI`) plutôt que décodée
+        depuis le flux stocké : pas de masques alpha ni d'images non
+        affichées, et une résolution adaptée à Tesseract.
+
+        Une page sans texte natif (page numérisée) est rendue en entier et
+        passée à l'OCR en une fois : le texte incrusté dans le fond de page
+        n'est pas perdu et Tesseract voit la mise en page complète.
+
+        Une zone d'image recouverte par du texte natif (fond de page,
+        filigrane, image sous une couche de texte) n'est pas passée à
+        l'OCR : son rendu contiendrait ce texte, déjà extrait.
+
+        Le contenu de la page n'est analysé qu'une fois : le texte, les mots
+        et les images sont lus dans une même `TextPage`. Ni
+        `get_image_info(xrefs=True)`, qui décode chaque image pour en
+        calculer l'empreinte, ni `get_text("dict")`, qui recopie les données
+        de chaque image, ne sont utilisés.
+
+        Args:
+            doc: Document PDF ouvert
+            page_num: Numéro de la page (à partir de 1)
+            total_pages: Nombre total de pages
+            seen: Empreintes des rendus déjà transmis à l'OCR (mis à jour)
+
+        Returns:
+            Page en attente d'OCR
+        """
+        logger.debug(f"Page {page_num}/{total_pages}")
+        page = doc[page_num - 1]
+        
+        if self.ocr and self.mupdf_ocr:
+            ocr_text = self._read_page_mupdf_ocr(page)
+            if ocr_text is not None:
+                return _PageWork(page_num=page_num, native_text=ocr_text, keys=[])
+        
+        # Sans OCR, seul le texte natif est utile
+        if not self.ocr:
+            return _PageWork(page_num=page_num, native_text=page.get_text("text"), keys=[])
+        
+        # Texte natif et images affichées sur la page, avec leur cadre
+        textpage = page.get_textpage(flags=TEXTPAGE_FLAGS)
+        native_text = textpage.extractText()
+        image_infos = textpage.extractIMGINFO()
+        if image_infos:
+            logger.debug(f"  - {len(image_infos)} image(s) détectée(s)")
+        
+        # Dimensions de l'image d'origine, connues sans la décoder
+        candidates = [info for info in image_infos if self._may_contain_text(info["width"], info["height"])]
+        if len(candidates) < len(image_infos):
+            logger.debug(f"  - {len(image_infos) - len(candidates)} image(s) trop petite(s) ignorée(s)")
+        
+        work = _PageWork(page_num=page_num, native_text=native_text, keys=[])
+        
+        # Page numérisée : une seule image, la page entière
+        if candidates and not native_text.strip():
+            logger.debug("  - Page sans texte natif : OCR de la page entière")
+            key = (page_num, 0)
+            work.keys.append(key)
+            try:
+                image, _ = self._render(page)
+                work.images.append((1, key, image))
+            except Exception as e:
+                logger.warning(f"Erreur lors du rendu de la page {page_num}: {e}")
+            return work
+        
+        # Mots du texte natif, lus à la première zone d'image
+        words: Optional[List[fitz.Rect]] = None
+        for img_index, info in enumerate(candidates, start=1):
+            clip = fitz.Rect(info["bbox"]) & page.rect
+            if clip.is_empty:
+                continue
+            
+            if words is None:
+                words = [fitz.Rect(word[:4]) for word in textpage.extractWORDS()]
+            if self._covers_text(clip, words):
+                logger.debug(f"  - Image {img_index} recouverte par du texte natif, ignorée")
+                continue
+            
+            try:
+                image, key = self._render(page, clip)
+            except Exception as e:
+                logger.warning(f"Erreur lors de l'OCR de l'image {img_index} (page {page_num}): {e}")
+                continue
+            work.keys.append(key)
+            
+            # Un rendu identique déjà vu dans le document (logo, en-tête...)
+            # n'est pas repassé à l'OCR : son texte est dans le cache
+            if key in seen:
+                continue
+            seen.add(key)
+            work.images.append((img_index, key, image))
+        
+        return work
+
+    def _read_page_mupdf_ocr(self, page: fitz.Page) -> Optional[str]:
+        """
+        Extrait le texte d'une page avec l'OCR intégré à PyMuPDF.
+
+        MuPDF passe lui-même les images de la page à Tesseract et fusionne
+        le texte reconnu avec le texte natif, sans PIL ni processus externe.
+        L'OCR a alors lieu dans le thread de lecture : les threads OCR, le
+        cache d'images et les options `binarize` et `psm` ne s'appliquent pas.
+
+        Args:
+            page: Page du PDF
+
+        Returns:
+            Texte de la page (natif + OCR), ou None si l'OCR de PyMuPDF est
+            indisponible ; il est alors désactivé pour la suite
+        """
+        try:
+            textpage = page.get_textpage_ocr(language=self.languages, dpi=RENDER_DPI, full=False)
+            return page.get_text("text", textpage=textpage)
+        except Exception as e:
+            self.mupdf_ocr = False
+            logger.warning(f"OCR de PyMuPDF indisponible ({e}), utilisation de l'OCR habituel")
+            return None
+
+    @staticmethod
+    def _render(page: fitz.Page, clip: Optional[fitz.Rect] = None) -> Tuple["Image.Image", bytes]:
+        """
+        Rend une page, ou une zone de page, en niveaux de gris pour l'OCR.
+
+        Tesseract travaille en niveaux de gris : le rendu est fait
+        directement dans cet espace (trois fois moins d'octets qu'en RVB).
+        `pix.samples` est une copie des pixels du rendu, sur laquelle
+        l'image PIL s'appuie sans conversion supplémentaire ; la
+        binarisation (`_binarize`) en produit ensuite une nouvelle copie.
+
+        Args:
+            page: Page du PDF
+            clip: Zone à rendre (défaut: page entière)
+
+        Returns:
+            Image PIL en mode "L" et empreinte de ses pixels
+        """
+        from PIL import Image
+        
+        pix = page.get_pixmap(clip=clip, dpi=RENDER_DPI, colorspace=fitz.csGRAY)
+        samples = pix.samples
+        digest = hashlib.blake2b(samples, digest_size=16).digest()
+        # "L" fait partie des modes que PIL peut adosser directement au
+        # tampon : pas de recopie au-delà de celle de `samples`
+        image = Image.frombuffer("L", (pix.width, pix.height), samples, "raw", "L", pix.stride, 1)
+        return image, digest
+
+    @staticmethod
+    def _covers_text(clip: fitz.Rect, words: List[fitz.Rect]) -> bool:
+        """
+        Indique si une zone de la page contient du texte natif.
+
+        Args:
+            clip: Zone de la page
+            words: Cadres des mots du texte natif de la page
+
+        Returns:
+            True si au moins un mot se trouve en majeure partie dans la zone
+        """
+        for word in words:
+            area = word.get_area()
+            if area and 2 * (word & clip).get_area() >= area:
+                return True
+        return False
+
+    @staticmethod
+    def _binarize(image: "Image.Image") -> "Image.Image":
+        """
+        Binarise une image en niveaux de gris par un seuil global calculé avec NumPy.
+
+        Le seuil (moyenne - 0,5 écart-type) sépare l'encre du fond en une
+        passe vectorisée, ce qui allège le prétraitement de Tesseract sur
+        les grandes images.
+
+        Args:
+            image: Image en mode "L"
+
+        Returns:
+            Image noir et blanc (0/255) en mode "L", ou l'image d'origine si
+            NumPy n'est pas installé
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return image
+        from PIL import Image
+        
+        pixels = np.asarray(image)
+        threshold = pixels.mean() - 0.5 * pixels.std()
+        return Image.fromarray((pixels > threshold).astype(np.uint8) * 255)
+
+    @staticmethod
+    def _may_contain_text(width: int, height: int) -> bool:
+        """
+        Indique si une image est assez grande pour contenir du texte.
+
+        Args:
+            width: Largeur de l'image en pixels
+            height: Hauteur de l'image en pixels
+
+        Returns:
+            False pour les images trop petites ou trop étirées
+        """
+        if width < MIN_IMAGE_WIDTH or height < MIN_IMAGE_HEIGHT or width * height < MIN_IMAGE_AREA:
+            return False
+        return max(width / height, height / width) <= MAX_IMAGE_ASPECT_RATIO
+
+    def _ocr_images(self, images: List[Tuple[int, ImageKey, "Image.Image"]], page_num: int) -> None:
+        """
+        Effectue l'OCR des images d'une page, avec un seul appel Tesseract.
+
+        Les images sont écrites dans un dossier temporaire et Tesseract lit
+        la liste de leurs chemins : le modèle de langue n'est chargé qu'une
+        fois par groupe de `MAX_IMAGES_PER_BATCH` images. Les textes
+        extraits sont enregistrés dans le cache OCR du document.
+
+        Args:
+            images: Triplets (index dans la page, clé, rendu de l'image)
+            page_num: Numéro de la page
+        """
+        if self.binarize:
+            images = [(img_index, key, self._binarize(image)) for img_index, key, image in images]
+        
+        # Avec tesserocr, chaque image est traitée sans lancer de processus :
+        # le regroupement n'apporte rien
+        if len(images) > 1 and self._get_api() is None:
+            self._ocr_image_batches(images, page_num)
+        elif images:
+            self._ocr_each_image(images, page_num)
+
+    def _ocr_each_image(self, images: List[Tuple[int, ImageKey, "Image.Image"]], page_num: int) -> None:
+        """
+        Effectue l'OCR des images une par une.
+
+        Les textes extraits sont enregistrés dans le cache OCR du document.
+
+        Args:
+            images: Triplets (index dans la page, clé, rendu de l'image)
+            page_num: Numéro de la page
+        """
+        for img_index, key, image in images:
+            try:
+                self._ocr_cache[key] = self._extract_text_from_image(
+                    image, page_num, img_index, full_page=key == (page_num, 0)
+                )
+            except Exception as e:
+                logger.warning(f"  - Erreur OCR image {img_index}: {e}")
+
+    def _ocr_image_batches(self, images: List[Tuple[int, ImageKey, "Image.Image"]], page_num: int) -> None:
+        """
+        Effectue l'OCR de plusieurs images par groupes, un appel Tesseract par groupe.
+
+        En cas d'échec, le groupe est traité image par image. Les textes
+        extraits sont enregistrés dans le cache OCR du document.
+
+        Args:
+            images: Triplets (index dans la page, clé, rendu de l'image)
+            page_num: Numéro de la page
+        """
+        with tempfile.TemporaryDirectory(prefix="ocr_") as tmp_dir:
+            # (triplet de l'image, chemin du fichier image)
+            image_files = []
+            for item in images:
+                img_index, _, image = item
+                try:
+                    image_files.append((item, self._write_image(image, tmp_dir, img_index)))
+                except Exception as e:
+                    logger.debug(f"  - Image {img_index} non exportée ({e}), OCR individuel")
+                    self._ocr_each_image([item], page_num)
+            
+            for start in range(0, len(image_files), MAX_IMAGES_PER_BATCH):
+                batch = image_files[start:start + MAX_IMAGES_PER_BATCH]
+                try:
+                    batch_texts = self._ocr_image_list(
+                        [path for _, path in batch],
+                        os.path.join(tmp_dir, f"images_{start}.txt")
+                    )
                 except Exception as e:
-                    logger.warning(f"  - Erreur OCR image {img_index}: {e}")
+                    logger.debug(f"  - OCR groupé impossible ({e}), OCR image par image")
+                    self._ocr_each_image([item for item, _ in batch], page_num)
                     continue
+                
+                for ((img_index, key, _), _), text in zip(batch, batch_texts):
+                    if text.strip():
+                        logger.debug(f"  - OCR image {img_index}: {len(text)} caractères extraits")
+                    self._ocr_cache[key] = text
 
-        doc.close()
+    def _ocr_image_list(self, image_paths: List[str], list_path: str) -> List[str]:
+        """
+        Lance Tesseract une seule fois sur une liste de fichiers image.
+
+        Args:
+            image_paths: Chemins des images
+            list_path: Chemin du fichier liste à créer
+
+        Returns:
+            Texte extrait de chaque image, dans l'ordre
+
+        Raises:
+            ValueError: Si le nombre de pages renvoyées ne correspond pas
+        """
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(image_paths) + "\n")
         
-        result = "\n\n".join(all_text)
-        logger.info(f"Extraction terminée: {len(result)} caractères")
-        return result
+        # Un chemin (str) est transmis tel quel à Tesseract, qui reconnaît
+        # un fichier liste ; chaque page se termine par un saut de page
+        output = self._run_tesseract(list_path)
+        pages = output.split("\x0c")
+        if len(pages) != len(image_paths) + 1:
+            raise ValueError(f"{len(pages) - 1} page(s) reçue(s) pour {len(image_paths)} image(s)")
+        
+        return [text + "\x0c" for text in pages[:-1]]
 
-    def _extract_text_from_image(self, doc: fitz.Document, xref: int, 
-                                  page_num: int, img_index: int) -> str:
+    def _run_tesseract(self, image: Union["Image.Image", str], config: Optional[str] = None) -> str:
         """
-        Effectue l'OCR sur une image embarquée dans le PDF.
+        Lance l'exécutable Tesseract sur une image ou un fichier liste.
+
+        Appelle directement `run_and_get_output`, sur lequel repose
+        `image_to_string`, avec une configuration préparée une fois pour
+        toutes à l'initialisation.
 
         Args:
-            doc: Document PDF ouvert
-            xref: Référence de l'image dans le PDF
+            image: Image PIL, ou chemin d'une image ou d'un fichier liste
+            config: Options de Tesseract (défaut: `tess_config`)
+
+        Returns:
+            Texte reconnu
+
+        Raises:
+            pytesseract.TesseractNotFoundError: Si Tesseract est introuvable
+        """
+        return self._pytesseract().pytesseract.run_and_get_output(
+            image, extension="txt", lang=self.languages, config=config or self.tess_config
+        )
+
+    @staticmethod
+    def _write_image(image: "Image.Image", tmp_dir: str, img_index: int) -> str:
+        """
+        Écrit le rendu d'une image dans un fichier lisible par Tesseract.
+
+        Le format PNM est une simple copie des pixels, sans compression.
+
+        Args:
+            image: Rendu de l'image
+            tmp_dir: Dossier de destination
+            img_index: Index de l'image dans la page
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        path = os.path.join(tmp_dir, f"image_{img_index}.pnm")
+        image.save(path)
+        return path
+
+    def _extract_text_from_image(self, image: "Image.Image", page_num: int, img_index: int,
+                                 full_page: bool = False) -> str:
+        """
+        Effectue l'OCR sur le rendu d'une image du PDF.
+
+        Args:
+            image: Rendu de l'image
             page_num: Numéro de la page
             img_index: Index de l'image dans la page
+            full_page: Rendu d'une page entière, segmenté avec `FULL_PAGE_PSM`
+                plutôt qu'avec `psm`
 
         Returns:
             Texte extrait par OCR
         """
+        api = self._get_api()
+        pytesseract = self._pytesseract() if api is None else None
+        
         try:
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            image = Image.open(io.BytesIO(image_bytes))
-            
             # OCR avec la langue configurée
-            text_ocr = pytesseract.image_to_string(image, lang=self.languages)
+            if api is not None:
+                # L'API du thread sert aux zones d'image comme aux pages
+                api.SetPageSegMode(FULL_PAGE_PSM if full_page else self.psm)
+                api.SetImage(image)
+                text_ocr = api.GetUTF8Text()
+            else:
+                text_ocr = self._run_tesseract(
+                    image, self.page_tess_config if full_page else self.tess_config
+                )
             
             if text_ocr.strip():
                 logger.debug(f"  - OCR image {img_index}: {len(text_ocr)} caractères extraits")
             
             return text_ocr
             
-        except pytesseract.TesseractNotFoundError:
-            logger.error("Tesseract n'est pas installé ou non trouvé dans le PATH")
-            raise
         except Exception as e:
+            if pytesseract is not None and isinstance(e, pytesseract.TesseractNotFoundError):
+                logger.error("Tesseract n'est pas installé ou non trouvé dans le PATH")
+                raise
             logger.warning(f"Erreur lors de l'OCR de l'image {img_index} (page {page_num}): {e}")
             return ""
 
@@ -149,6 +808,11 @@ Exemples:
   %(prog)s document.pdf
   %(prog)s document.pdf -o texte_extrait.txt
   %(prog)s document.pdf -l fra
+  %(prog)s document.pdf --workers 2
+  %(prog)s document.pdf --no-ocr
+  %(prog)s document.pdf --no-binarize
+  %(prog)s document.pdf --psm 3
+  %(prog)s document.pdf --mupdf-ocr
   %(prog)s document.pdf --tesseract-path "C:\\tesseract\\tesseract.exe"
         """
     )
@@ -176,6 +840,33 @@ Exemples:
         default=None,
         help="Chemin vers tesseract.exe si différent de l'emplacement par défaut"
     )
+    parser.add_argument(
+        "--no-ocr",
+        action="store_true",
+        help="Extraire uniquement le texte natif, sans OCR des images"
+    )
+    parser.add_argument(
+        "--no-binarize",
+        action="store_true",
+        help="Laisser Tesseract binariser les images lui-même (sans seuillage NumPy)"
+    )
+    parser.add_argument(
+        "--psm",
+        type=int,
+        default=DEFAULT_PSM,
+        help=f"Mode de segmentation Tesseract des images (défaut: {DEFAULT_PSM} ; 3 pour plusieurs colonnes ou orientations ; les pages numérisées utilisent toujours {FULL_PAGE_PSM})"
+    )
+    parser.add_argument(
+        "--mupdf-ocr",
+        action="store_true",
+        help="Utiliser l'OCR intégré à PyMuPDF, une page par appel (sans --workers, --psm ni binarisation)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Nombre de threads OCR en parallèle (défaut: nombre de cœurs, {DEFAULT_MAX_WORKERS} max)"
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -207,29 +898,38 @@ Exemples:
         output_path = args.pdf.parent / f"{args.pdf.stem}_extracted.txt"
 
     try:
-        # Créer l'extracteur et traiter le PDF
-        extractor = PDFTextExtractor(
-            tesseract_path=str(args.tesseract_path) if args.tesseract_path else None,
-            languages=args.lang
-        )
-        
-        text = extractor.extract_text_from_pdf(args.pdf)
+        # Ne pas créer de fichier de sortie vide si le PDF est introuvable
+        if not args.pdf.exists():
+            raise FileNotFoundError(f"Le fichier PDF n'existe pas: {args.pdf}")
         
-        # Sauvegarder le résultat
-        output_path.write_text(text, encoding="utf-8")
+        # Créer l'extracteur et traiter le PDF ; le texte est écrit
+        # au fur et à mesure dans le fichier de sortie (tampon de 1 Mio
+        # pour regrouper les écritures)
+        with PDFTextExtractor(
+            tesseract_path=str(args.tesseract_path) if args.tesseract_path else None,
+            languages=args.lang,
+            workers=args.workers,
+            ocr=not args.no_ocr,
+            binarize=not args.no_binarize,
+            psm=args.psm,
+            mupdf_ocr=args.mupdf_ocr
+        ) as extractor, output_path.open("w", encoding="utf-8", buffering=1 << 20) as out:
+            chars_written = extractor.extract_text_from_pdf(args.pdf, out)
         
         logger.info(f"✓ Extraction réussie !")
         logger.info(f"✓ Enregistré dans: {output_path}")
-        logger.info(f"✓ Total: {len(text)} caractères extraits")
+        logger.info(f"✓ Total: {chars_written} caractères extraits")
         
     except FileNotFoundError as e:
         logger.error(f"Fichier introuvable: {e}")
         sys.exit(1)
-    except pytesseract.TesseractNotFoundError:
-        logger.error("Tesseract OCR n'est pas installé ou configuré correctement")
-        logger.error("Installez Tesseract depuis: https://github.com/tesseract-ocr/tesseract")
-        sys.exit(1)
     except Exception as e:
+        # pytesseract n'est importé que si une image a été passée à l'OCR
+        pytesseract = sys.modules.get("pytesseract")
+        if pytesseract is not None and isinstance(e, pytesseract.TesseractNotFoundError):
+            logger.error("Tesseract OCR n'est pas installé ou configuré correctement")
+            logger.error("Installez Tesseract depuis: https://github.com/tesseract-ocr/tesseract")
+            sys.exit(1)
         logger.error(f"Erreur lors du traitement: {e}", exc_info=args.verbose)
         sys.exit(1)
 
@@ -0,0 +1,6 @@
+"""Configuration commune des tests : modules du dépôt importables."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
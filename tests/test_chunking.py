@@ -0,0 +1,128 @@
+"""
+Équivalence du découpage en segments avec l'implémentation d'origine.
+
+Le découpage (phrases, paragraphes, segments) a été réécrit pour aller
+plus vite ; il doit produire exactement les mêmes segments que le code
+d'origine, figé ci-dessous, sur un corpus aléatoire.
+"""
+
+import random
+import re
+from typing import List
+
+import pytest
+
+from clean_text import TextCorrector, _split_sentences, iter_paragraphs
+
+# Nombre de textes aléatoires par graine
+CASES_PER_SEED = 500
+
+# Fragments du corpus : ponctuation, espaces Unicode, caractères
+# multi-octets et fins de ligne variées
+WORDS = [
+    "le", "la", "un", "texte", "OCR", "é", "à", "ça.", "phrase!", "fin?",
+    "漢字", "mot.", "x", ".", "!", "?", " ", "  ", "\t", "\n", "\n\n",
+    "\n\n\n", "\u00a0", "\u2003", "\u3000",
+]
+JOINERS = ["", " ", "\n", "\n\n", ". ", "  ", "? ", "! "]
+MAX_CHARS = [5, 10, 20, 37, 80, 200, 1500]
+
+
+def baseline_split_text_into_chunks(text: str, max_chars: int = 2000) -> List[str]:
+    """Découpage d'origine (`TextCorrector.split_text_into_chunks`), figé."""
+    paragraphs = text.split('\n\n')
+    chunks = []
+    current_chunk = ""
+
+    for paragraph in paragraphs:
+        if len(paragraph) > max_chars:
+            sentences = re.split(r'(?<=[.!?])\s+', paragraph)
+
+            for sentence in sentences:
+                if not sentence.strip():
+                    continue
+
+                if len(sentence) > max_chars:
+                    for i in range(0, len(sentence), max_chars):
+                        chunk_part = sentence[i:i + max_chars]
+                        if current_chunk and len(current_chunk + chunk_part) > max_chars:
+                            chunks.append(current_chunk.strip())
+                            current_chunk = chunk_part
+                        else:
+                            current_chunk += " " + chunk_part if current_chunk else chunk_part
+                else:
+                    if current_chunk and len(current_chunk + sentence) > max_chars:
+                        chunks.append(current_chunk.strip())
+                        current_chunk = sentence
+                    else:
+                        current_chunk += " " + sentence if current_chunk else sentence
+        else:
+            if current_chunk and len(current_chunk + paragraph) > max_chars:
+                chunks.append(current_chunk.strip())
+                current_chunk = paragraph
+            else:
+                current_chunk += "\n\n" + paragraph if current_chunk else paragraph
+
+    if current_chunk.strip():
+        chunks.append(current_chunk.strip())
+
+    return chunks
+
+
+def random_text(rng: random.Random, max_words: int = 400) -> str:
+    """Texte aléatoire construit à partir du corpus."""
+    return "".join(
+        rng.choice(WORDS) + rng.choice(JOINERS)
+        for _ in range(rng.randint(0, max_words))
+    )
+
+
+@pytest.fixture
+def corrector(monkeypatch):
+    """Correcteur sans tokenizer, sans accès à l'API."""
+    monkeypatch.setattr(TextCorrector, "_check_api_connection", lambda self: None)
+    with TextCorrector() as corrector:
+        yield corrector
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_split_sentences_matches_regex(seed):
+    rng = random.Random(seed)
+    for _ in range(CASES_PER_SEED):
+        paragraph = random_text(rng)
+        assert _split_sentences(paragraph) == re.split(r'(?<=[.!?])\s+', paragraph)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_chunks_match_baseline(corrector, seed):
+    rng = random.Random(seed)
+    for _ in range(CASES_PER_SEED):
+        text = random_text(rng)
+        max_chars = rng.choice(MAX_CHARS)
+        expected = baseline_split_text_into_chunks(text, max_chars)
+
+        assert corrector.split_text_into_chunks(text, max_chars=max_chars) == expected
+        assert corrector.split_text_into_chunks_bytes(text.encode("utf-8"), max_chars=max_chars) == expected
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_iter_paragraphs_matches_read_text(tmp_path, seed):
+    rng = random.Random(seed)
+    path = tmp_path / "texte.txt"
+    for case in range(CASES_PER_SEED // 5):
+        text = random_text(rng, max_words=200)
+        # Fins de ligne Windows et Mac dans une partie des fichiers
+        if case % 2:
+            text = text.replace("\n", rng.choice(["\r\n", "\r", "\n"]))
+        path.write_bytes(text.encode("utf-8"))
+
+        expected = path.read_text(encoding="utf-8").split("\n\n")
+        # Petits blocs : séparateurs et caractères à cheval sur deux blocs
+        for block_size in (1, 3, 64, 1 << 20):
+            assert list(iter_paragraphs(path, block_size=block_size)) == expected
+
+
+def test_iter_paragraphs_empty_file(tmp_path):
+    path = tmp_path / "vide.txt"
+    path.write_bytes(b"")
+    assert list(iter_paragraphs(path)) == path.read_text(encoding="utf-8").split("\n\n")